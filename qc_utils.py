@@ -2,130 +2,747 @@
 Qiskit 주피터 노트북 유틸리티
 양자 회로를 실행하고 결과를 시각화하는 편의 함수들
 """
-from qiskit import QuantumCircuit
-from matplotlib import pyplot as plt
-from qiskit_ibm_runtime import SamplerV2
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
+from qiskit import QuantumCircuit, transpile
+from qiskit.transpiler.preset_passmanagers import generate_preset_pass_manager
+import numpy as np
+from qiskit.circuit import AnnotatedOperation, ControlFlowOp, Instruction, Measure
+from qiskit.circuit.library import UnitaryGate, Initialize, StatePreparation
 from qiskit.quantum_info import Statevector
-from IPython.display import display
+from collections import OrderedDict
+from operator import itemgetter
+import heapq
+import io
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
 
+# backend=None일 때 공용으로 쓰는 이상적 시뮬레이터 (처음 필요할 때 생성)
+_DEFAULT_AER = None
+
+# 이론값 계산용 GPU statevector 시뮬레이터 (None: 확인 전, False: GPU 없음)
+_GPU_AER = None
+
+# 이 큐비트 수 이상인 회로는 GPU가 있으면 이론값을 GPU에서 계산
+_GPU_MIN_QUBITS = 20
+
+# 백엔드별 SamplerV2 캐시: (백엔드 id, 이름) -> (백엔드, SamplerV2)
+# (SamplerV2가 백엔드를 참조하므로 크기를 제한하여 오래된 백엔드는 해제되도록 함)
+_SAMPLER_CACHE = OrderedDict()
+_SAMPLER_CACHE_SIZE = 4
+
+# 트랜스파일 결과 캐시: (회로 지문, 레지스터, 전역 위상, 백엔드, 최적화 레벨) -> (백엔드, 트랜스파일된 회로)
+_TRANSPILE_CACHE = OrderedDict()
+_TRANSPILE_CACHE_SIZE = 64
+
+# 파라미터만으로 동작이 정해지는 비표준 연산 (회로 지문에 정의를 펼치지 않음)
+_PARAMETER_DEFINED_OPS = (ControlFlowOp, Measure, UnitaryGate, Initialize, StatePreparation)
+
+# transpile 시드 (같은 회로는 항상 같은 레이아웃/라우팅 결과가 나오도록 고정)
+_TRANSPILE_SEED = 0
+
+# 프리셋 PassManager 캐시: (백엔드, 최적화 레벨) -> (백엔드, PassManager)
+_PASS_MANAGER_CACHE = OrderedDict()
+_PASS_MANAGER_CACHE_SIZE = 8
+
+# 이론적 counts 캐시: (회로 지문, 샷 수) -> counts
+_IDEAL_COUNTS_CACHE = OrderedDict()
+_IDEAL_COUNTS_CACHE_SIZE = 64
+
+# 노트북(ipykernel) 안에서 실행 중인지 여부 (아니면 mpl 그림을 표시할 수 없음)
+# (IPython이 로드되지 않았다면 노트북이 아니므로 IPython을 새로 import하지 않음)
+_IN_NOTEBOOK = ('IPython' in sys.modules
+                and 'IPKernelApp' in getattr(sys.modules['IPython'].get_ipython(), 'config', {}))
+
+# 결과 표에 표시할 최대 상태 수 (나머지는 개수만 표시)
+_MAX_DISPLAY_STATES = 16
+
+# 이 깊이를 넘는 회로는 mpl 대신 텍스트로 그림 (mpl 레이아웃이 수 초 걸림)
+_MAX_MPL_DEPTH = 200
+
+# 히스토그램 Figure 캐시: (행, 열, figsize) -> (fig, axes)
+_FIG_CACHE = OrderedDict()
+_FIG_CACHE_SIZE = 8
+
+# mpl 회로도 PNG 캐시: (회로 지문, 제목) -> PNG 바이트
+_DRAW_CACHE = OrderedDict()
+_DRAW_CACHE_SIZE = 32
+
 
 # ==================== 내부 헬퍼 함수 ====================
 
-def _display_circuit(qc: QuantumCircuit, style='mpl', title=None):
-    """회로 시각화 (내부 함수)"""
+def _figure_png(fig):
+    """Figure를 Agg로 PNG 렌더링 (내부 함수)"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def _show_figure(fig):
+    """Figure를 PNG로 렌더링하여 표시 (내부 함수)"""
+    from IPython.display import display, Image
+    display(Image(data=_figure_png(fig), format='png'))
+
+
+def _draw_key(qc: QuantumCircuit, circuit_key=None):
+    """회로도 캐시용 지문 (레지스터 이름, 전역 위상까지 포함) (내부 함수)"""
+    if circuit_key is None:
+        circuit_key = _circuit_key(qc)
+    registers = tuple((register.name, register.size) for register in qc.qregs + qc.cregs)
+    return (circuit_key, registers, _param_key(qc.global_phase))
+
+
+def _display_circuit(qc: QuantumCircuit, style='mpl', title=None, circuit_key=None):
+    """회로 시각화 (circuit_key: 미리 계산한 회로 지문) (내부 함수)"""
+    # 노트북이 아니거나 너무 깊은 회로는 mpl 대신 텍스트로 표시
+    if style not in ('text', 'latex') and (not _IN_NOTEBOOK or qc.depth() > _MAX_MPL_DEPTH):
+        style = 'text'
+    
     try:
-        if style == 'mpl':
-            fig = qc.draw('mpl', scale=0.5)
-            if title:
-                fig.suptitle(title)
-            display(fig)
-        elif style == 'text':
+        if style == 'text':
             if title:
                 print(f"\n{title}:")
             print(qc.draw())
         elif style == 'latex':
             if title:
                 print(f"\n{title}:")
+            from IPython.display import display
             display(qc.draw('latex'))
         else:
-            fig = qc.draw('mpl', scale=0.5)
-            if title:
-                fig.suptitle(title)
-            display(fig)
+            from IPython.display import display, Image
+            
+            # 같은 회로를 다시 그릴 때는 캐시된 PNG를 그대로 표시
+            key = (_draw_key(qc, circuit_key), title)
+            png = _cache_get(_DRAW_CACHE, key)
+            if png is None:
+                from matplotlib import pyplot as plt
+                fig = qc.draw('mpl', scale=0.5)
+                if title:
+                    fig.suptitle(title)
+                png = _figure_png(fig)
+                plt.close(fig)
+                _cache_put(_DRAW_CACHE, key, png, _DRAW_CACHE_SIZE)
+            display(Image(data=png, format='png'))
     except Exception as e:
         print(f"회로 시각화 오류 (텍스트로 대체): {e}")
         print(qc.draw())
 
 
-def _display_circuits_grid(circuits: list[QuantumCircuit], labels: list[str], style='mpl'):
-    """여러 회로를 가로로 배치 (내부 함수)"""
+def _display_circuits_grid(circuits: list[QuantumCircuit], labels: list[str], style='mpl',
+                           circuit_keys=None):
+    """여러 회로를 가로로 배치 (circuit_keys: 미리 계산한 회로 지문 리스트) (내부 함수)"""
     n_circuits = len(circuits)
     
+    # 노트북이 아니거나 깊은 회로(주로 transpile 결과)가 있으면 텍스트로 대체
+    if style == 'mpl' and (not _IN_NOTEBOOK
+                           or any(circuit.depth() > _MAX_MPL_DEPTH for circuit in circuits)):
+        style = 'text'
+    
     if style == 'mpl':
-        fig, axes = plt.subplots(1, n_circuits, figsize=(4 * n_circuits, 3))
-        if n_circuits == 1:
-            axes = [axes]
-        
-        for idx, (circuit, label) in enumerate(zip(circuits, labels)):
-            try:
-                circuit.draw('mpl', ax=axes[idx], scale=0.5)
-                axes[idx].set_title(label)
-            except Exception as e:
-                axes[idx].text(0.5, 0.5, f"오류: {e}", ha='center', va='center', fontsize=8)
+        from IPython.display import display, Image
         
-        fig.tight_layout()
-        display(fig)
-        plt.close()
+        # 같은 회로/레이블 조합은 캐시된 PNG를 그대로 표시
+        if circuit_keys is None:
+            circuit_keys = _circuit_keys(circuits)
+        key = (tuple(_draw_key(circuit, circuit_key)
+                     for circuit, circuit_key in zip(circuits, circuit_keys)), tuple(labels))
+        png = _cache_get(_DRAW_CACHE, key)
+        if png is None:
+            # 회로 그리기는 전역 위상 등을 pyplot 현재 Figure에 쓰므로 pyplot Figure를 사용
+            # (반복 그리기는 PNG 캐시로 생략됨)
+            from matplotlib import pyplot as plt
+            fig, axes = plt.subplots(1, n_circuits, figsize=(4 * n_circuits, 3),
+                                     constrained_layout=True, squeeze=False)
+            axes = axes[0]
+            
+            for idx, (circuit, label) in enumerate(zip(circuits, labels)):
+                try:
+                    circuit.draw('mpl', ax=axes[idx], scale=0.5)
+                    axes[idx].set_title(label)
+                except Exception as e:
+                    axes[idx].text(0.5, 0.5, f"오류: {e}", ha='center', va='center', fontsize=8)
+            
+            png = _figure_png(fig)
+            plt.close(fig)
+            _cache_put(_DRAW_CACHE, key, png, _DRAW_CACHE_SIZE)
+        display(Image(data=png, format='png'))
     else:
         # text나 latex는 세로로 표시
         for circuit, label in zip(circuits, labels):
             _display_circuit(circuit, style=style, title=label)
 
 
+def _cache_get(cache: OrderedDict, key):
+    """LRU 캐시 조회, 없으면 None (내부 함수)"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _cache_put(cache: OrderedDict, key, value, maxsize: int):
+    """LRU 캐시에 저장하고 오래된 항목부터 제거 (내부 함수)"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+def _param_key(param):
+    """게이트 파라미터를 해시 가능한 값으로 변환 (내부 함수)"""
+    if isinstance(param, QuantumCircuit):
+        return _circuit_key(param)
+    if hasattr(param, 'tobytes'):
+        # numpy 배열 (UnitaryGate 행렬 등)
+        return (getattr(param, 'shape', ()), param.tobytes())
+    try:
+        hash(param)
+    except TypeError:
+        return repr(param)
+    return param
+
+
+def _operation_key(operation, memo=None):
+    """연산(게이트)의 해시 가능한 지문 생성 (내부 함수)"""
+    if not isinstance(operation, Instruction):
+        # Instruction이 아닌 연산(Clifford, AnnotatedOperation 등)은 내용으로 구분
+        if isinstance(operation, AnnotatedOperation):
+            return (operation.name, _operation_key(operation.base_op, memo),
+                    _param_key(tuple(operation.modifiers)))
+        tableau = getattr(operation, 'tableau', None)
+        if tableau is not None:
+            return (operation.name, _param_key(tableau))
+        return (operation.name, repr(operation))
+    
+    key = (operation.name,
+           tuple(_param_key(p) for p in getattr(operation, 'params', ())),
+           getattr(operation, 'ctrl_state', None),
+           getattr(operation, 'label', None),
+           _param_key(getattr(operation, 'condition', None)))
+    
+    # 표준 게이트/명령, 제어 흐름(블록은 params에 포함), 파라미터로 정해지는 연산은 이것으로 충분
+    if (getattr(operation, '_standard_gate', None) is not None
+            or getattr(operation, '_standard_instruction_type', None) is not None
+            or isinstance(operation, _PARAMETER_DEFINED_OPS)):
+        return key
+    
+    # 사용자 정의/합성 게이트는 이름이 같아도 내용이 다를 수 있으므로 정의까지 포함
+    definition = getattr(operation, 'definition', None)
+    if definition is None:
+        # 정의가 없는(opaque) 연산은 객체 자체로 구분
+        return key + (id(operation),)
+    return key + (_circuit_key(definition, memo),)
+
+
+def _circuit_key(qc: QuantumCircuit, memo=None):
+    """
+    회로 구조로부터 해시 가능한 지문 생성 (내부 함수)
+    
+    memo는 같은 연산 객체(반복 추가된 사용자 정의 게이트 등)의 지문을
+    한 번만 계산하기 위한 사전으로, 하위 정의를 펼칠 때도 함께 사용한다.
+    """
+    if memo is None:
+        memo = {}
+    # find_bit 호출 대신 비트 -> 인덱스 사전을 한 번만 만들어 조회
+    qubit_index = {bit: i for i, bit in enumerate(qc.qubits)}
+    clbit_index = {bit: i for i, bit in enumerate(qc.clbits)}
+    
+    instructions = []
+    for instruction in qc.data:
+        operation = instruction.operation
+        # 연산 객체를 함께 보관하여 계산 중에 id가 다른 객체에 재사용되지 않도록 함
+        entry = memo.get(id(operation))
+        if entry is None:
+            entry = memo[id(operation)] = (operation, _operation_key(operation, memo))
+        instructions.append((entry[1],
+                             tuple(qubit_index[q] for q in instruction.qubits),
+                             tuple(clbit_index[c] for c in instruction.clbits)))
+    return (qc.num_qubits, qc.num_clbits, tuple(instructions))
+
+
+def _circuit_keys(circuits: list[QuantumCircuit]):
+    """여러 회로의 지문 리스트 (같은 회로 객체는 한 번만 계산) (내부 함수)"""
+    computed = {}
+    for circuit in circuits:
+        if id(circuit) not in computed:
+            computed[id(circuit)] = _circuit_key(circuit)
+    return [computed[id(circuit)] for circuit in circuits]
+
+
+def _creg_layout(qc: QuantumCircuit):
+    """고전 레지스터 구성 (이름, 크기) 튜플 (내부 함수)"""
+    return tuple((register.name, register.size) for register in qc.cregs)
+
+
+def _with_measurements(qc: QuantumCircuit):
+    """측정이 없으면 측정을 추가한 새 회로, 있으면 원본 그대로 반환 (내부 함수)"""
+    # 이미 측정이 있는 회로는 수정할 필요가 없으므로 복사하지 않음
+    if qc.cregs:
+        return qc
+    return qc.measure_all(inplace=False)
+
+
+def _unique_circuits(circuits: list[QuantumCircuit], circuit_keys: list):
+    """
+    동일한 회로를 하나로 합침 (내부 함수)
+    
+    Returns:
+        tuple: (중복 없는 회로 리스트, 그 회로들의 지문 리스트, 원래 각 위치가 가리키는 인덱스 리스트)
+    """
+    unique = []
+    unique_keys = []
+    positions = []
+    seen = {}
+    for circuit, circuit_key in zip(circuits, circuit_keys):
+        # 결과는 고전 레지스터(meas) 구성에 따라 달라지므로 레지스터 구성까지 같아야 동일
+        key = (circuit_key, _creg_layout(circuit))
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(circuit)
+            unique_keys.append(circuit_key)
+        positions.append(seen[key])
+    return unique, unique_keys, positions
+
+
+def _transpile_cached(circuits: list[QuantumCircuit], backend, optimization_level=1,
+                      circuit_keys=None):
+    """
+    트랜스파일 결과를 캐시하여 재사용 (내부 함수)
+
+    같은 회로를 같은 백엔드에서 다시 실행하면 최적화 과정을 건너뛰고,
+    캐시에 없는 회로만 모아 PassManager 한 번으로 transpile한다.
+    circuit_keys가 주어지면 회로 지문을 다시 계산하지 않는다.
+    """
+    if circuit_keys is None:
+        circuit_keys = [_circuit_key(qc) for qc in circuits]
+    backend_id = (id(backend), getattr(backend, 'name', None))
+    # 결과를 읽는 고전 레지스터 구성과 (회로도에 표시되는) 전역 위상도 키에 포함
+    keys = [(circuit_key, _creg_layout(qc), _param_key(qc.global_phase),
+             backend_id, optimization_level) for qc, circuit_key in zip(circuits, circuit_keys)]
+    
+    # 백엔드를 함께 보관하므로 캐시에 있는 동안 id가 다른 객체에 재사용되지 않음
+    entries = [_cache_get(_TRANSPILE_CACHE, key) for key in keys]
+    hw_circuits = [entry[1] if entry is not None and entry[0] is backend else None
+                   for entry in entries]
+    
+    missing = [i for i, hw_circuit in enumerate(hw_circuits) if hw_circuit is None]
+    if missing:
+        # 프리셋 PassManager 하나로 여러 회로를 한 번에 처리 (내부적으로 병렬 실행)
+        pass_manager = _get_pass_manager(backend, optimization_level)
+        transpiled = pass_manager.run([circuits[i] for i in missing])
+        for i, hw_circuit in zip(missing, transpiled):
+            hw_circuits[i] = hw_circuit
+            _cache_put(_TRANSPILE_CACHE, keys[i], (backend, hw_circuit), _TRANSPILE_CACHE_SIZE)
+    
+    return hw_circuits
+
+
+def _get_pass_manager(backend, optimization_level=1):
+    """백엔드/최적화 레벨별 프리셋 PassManager를 재사용 (내부 함수)"""
+    key = (id(backend), getattr(backend, 'name', None), optimization_level)
+    entry = _cache_get(_PASS_MANAGER_CACHE, key)
+    # 백엔드를 함께 보관하므로 캐시에 있는 동안 id가 다른 객체에 재사용되지 않음
+    if entry is None or entry[0] is not backend:
+        pass_manager = generate_preset_pass_manager(optimization_level=optimization_level,
+                                                    backend=backend,
+                                                    seed_transpiler=_TRANSPILE_SEED)
+        entry = (backend, pass_manager)
+        _cache_put(_PASS_MANAGER_CACHE, key, entry, _PASS_MANAGER_CACHE_SIZE)
+    return entry[1]
+
+
+def _default_backend():
+    """공용 AerSimulator를 한 번만 만들어 재사용 (내부 함수)"""
+    global _DEFAULT_AER
+    if _DEFAULT_AER is None:
+        from qiskit_aer import AerSimulator
+        _DEFAULT_AER = AerSimulator()
+    return _DEFAULT_AER
+
+
+def _gpu_backend():
+    """GPU statevector 시뮬레이터를 반환, 사용할 수 없으면 None (내부 함수)"""
+    global _GPU_AER
+    if _GPU_AER is None:
+        from qiskit_aer import AerSimulator
+        # GPU 빌드(qiskit-aer-gpu)이고 장치가 있을 때만 사용 (확인은 한 번만)
+        _GPU_AER = False
+        if 'GPU' in _default_backend().available_devices():
+            _GPU_AER = AerSimulator(method='statevector', device='GPU')
+    return _GPU_AER or None
+
+
+def _get_sampler(backend):
+    """백엔드에 대응하는 SamplerV2를 재사용 (내부 함수)"""
+    from qiskit_ibm_runtime import SamplerV2
+    
+    key = (id(backend), getattr(backend, 'name', None))
+    entry = _cache_get(_SAMPLER_CACHE, key)
+    # 백엔드를 함께 보관하므로 캐시에 있는 동안 id가 다른 객체에 재사용되지 않음
+    if entry is None or entry[0] is not backend:
+        entry = (backend, SamplerV2(backend))
+        _cache_put(_SAMPLER_CACHE, key, entry, _SAMPLER_CACHE_SIZE)
+    return entry[1]
+
+
+def _backend_info(backend):
+    """백엔드의 (하드웨어 여부, 이름)을 반환 (내부 함수)"""
+    # AerSimulator는 시뮬레이터, 실제 하드웨어는 IBMBackend 타입
+    # (qiskit_aer가 로드되지 않았다면 AerSimulator일 수 없으므로 import하지 않고 판단)
+    qiskit_aer = sys.modules.get('qiskit_aer')
+    is_hardware = qiskit_aer is None or not isinstance(backend, qiskit_aer.AerSimulator)
+    return is_hardware, getattr(backend, 'name', 'Simulator')
+
+
+def _get_figure(nrows: int, ncols: int, figsize: tuple):
+    """
+    같은 크기의 Figure/Axes를 재사용 (내부 함수)
+    
+    pyplot에 등록되지 않은 Figure라서 plt.close() 없이 계속 재사용할 수 있고,
+    constrained layout을 생성 시 한 번만 설정한다.
+    """
+    key = (nrows, ncols, figsize)
+    entry = _cache_get(_FIG_CACHE, key)
+    if entry is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        fig = Figure(figsize=figsize, layout='constrained')
+        FigureCanvasAgg(fig)
+        axes = fig.subplots(nrows, ncols, squeeze=False)
+        entry = (fig, axes)
+        _cache_put(_FIG_CACHE, key, entry, _FIG_CACHE_SIZE)
+    
+    fig, axes = entry
+    for ax in axes.flat:
+        ax.cla()
+    return fig, axes
+
+
 def _run_circuit(circuit: QuantumCircuit, backend, shots=1000):
     """회로 실행 (내부 함수)"""
-    sampler = SamplerV2(backend)
-    job = sampler.run([circuit], shots=shots)
-    result = job.result()
-    return result[0].data.meas.get_counts()
+    return _run_circuits_batch([circuit], backend, shots)[0]
 
 
 def _run_circuits_batch(circuits: list[QuantumCircuit], backend, shots=1000):
     """여러 회로 배치 실행 (내부 함수)"""
-    sampler = SamplerV2(backend)
-    job = sampler.run(circuits, shots=shots)
+    return _collect_counts(_submit_circuits(circuits, backend, shots))
+
+
+def _submit_circuits(circuits: list[QuantumCircuit], backend, shots=1000):
+    """여러 회로를 한 작업으로 제출하고 결과를 기다리지 않고 job 반환 (내부 함수)"""
+    sampler = _get_sampler(backend)
+    return sampler.run(circuits, shots=shots)
+
+
+def _collect_counts(job):
+    """제출한 job의 결과를 기다려 counts 리스트로 변환 (내부 함수)"""
     results = job.result()
-    return [pub_result.data.meas.get_counts() for pub_result in results]
+    return [_bitarray_counts(pub_result.data.meas) for pub_result in results]
+
+
+def _bitarray_counts(bit_array):
+    """
+    BitArray 측정 결과를 counts dict로 변환 (내부 함수)
+    
+    BitArray.get_counts()처럼 샷마다 문자열을 만들지 않고,
+    NumPy로 고유한 결과만 집계한 뒤 그 결과들만 문자열로 변환한다.
+    """
+    num_bits = bit_array.num_bits
+    rows = bit_array.array.reshape(-1, bit_array.array.shape[-1])
+    
+    # 64비트를 넘으면 대부분의 결과가 고유하므로 집계 이점이 없음
+    if rows.shape[1] > 8:
+        return bit_array.get_counts()
+    
+    # 각 샷을 64비트 정수 하나로 묶음 (첫 바이트의 사용하지 않는 상위 비트는 0으로 정리)
+    packed = np.zeros((rows.shape[0], 8), dtype=np.uint8)
+    packed[:, 8 - rows.shape[1]:] = rows
+    packed[:, 8 - rows.shape[1]] &= 0xFF >> (8 * rows.shape[1] - num_bits)
+    
+    values, counts = np.unique(packed.view('>u8').ravel(), return_counts=True)
+    return {format(int(value), f'0{num_bits}b'): int(count)
+            for value, count in zip(values, counts)}
+
+
+def _percentages(values, shots: int):
+    """횟수 배열을 백분율 배열로 한 번에 변환 (내부 함수)"""
+    return np.asarray(values, dtype=np.float64) * (100.0 / shots)
+
+
+def _format_top(counts: dict, shots: int, top=3):
+    """빈도 상위 top개 상태를 한 줄 문자열로 변환 (내부 함수)"""
+    items = heapq.nlargest(top, counts.items(), key=itemgetter(1))
+    percentages = _percentages([count for _, count in items], shots)
+    return "".join(f"  |{state}⟩: {percentage:5.1f}%"
+                   for (state, _), percentage in zip(items, percentages))
+
+
+def _print_counts(counts: dict, shots: int, top=_MAX_DISPLAY_STATES, indent=''):
+    """측정 결과를 빈도순으로 정렬하여 상위 top개를 한 번에 출력 (내부 함수)"""
+    items = counts.items()
+    if top < len(counts):
+        # 상위 몇 개만 필요하므로 전체 정렬 대신 O(n log k) 선택
+        items = heapq.nlargest(top, items, key=itemgetter(1))
+    
+    # items를 한 번만 순회하여 상태/횟수 분리
+    states, values = zip(*items)
+    states = np.array(states)
+    values = np.array(values, dtype=np.int64)
+    
+    # 빈도 내림차순 (동률이면 기존 순서 유지)
+    order = np.argsort(-values, kind='stable')
+    probabilities = _percentages(values[order], shots)
+    
+    lines = [f"{indent}|{state}⟩: {count:4d}회 ({probability:6.2f}%)"
+             for state, count, probability in zip(states[order], values[order], probabilities)]
+    if top < len(counts):
+        lines.append(f"{indent}... 외 {len(counts) - top}개 상태 생략")
+    print('\n'.join(lines))
+
+
+def _sorted_counts(counts: dict):
+    """counts를 상태 순으로 정렬한 (상태 배열, 횟수 배열) 반환 (내부 함수)"""
+    states = list(counts.keys())
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    order = _state_order(states)
+    return np.array(states)[order], values[order]
+
+
+def _state_order(states: list[str]):
+    """상태 비트열을 정수값 순으로 정렬하는 인덱스 배열 반환 (내부 함수)"""
+    # int64에 담기지 않는 긴 비트열은 (같은 길이이므로) 문자열 순서가 곧 정수 순서
+    if states and len(states[0]) > 62:
+        return np.argsort(np.array(states), kind='stable')
+    # 문자열 비교 대신 정수로 한 번 변환한 뒤 NumPy로 정렬 (레지스터 구분 공백은 제거)
+    int_states = np.fromiter((int(state.replace(' ', ''), 2) for state in states),
+                             dtype=np.int64, count=len(states))
+    return np.argsort(int_states, kind='stable')
+
+
+def _align_counts(*counts_list):
+    """여러 counts를 공통 상태 축 위의 정수 배열로 정렬 (내부 함수)"""
+    states = list(set().union(*counts_list))
+    states = [states[i] for i in _state_order(states)]
+    index = {state: i for i, state in enumerate(states)}
+    
+    arrays = []
+    for counts in counts_list:
+        values = np.zeros(len(states), dtype=np.int64)
+        for state, count in counts.items():
+            values[index[state]] = count
+        arrays.append(values)
+    return states, arrays
 
 
-def _get_ideal_counts(circuit: QuantumCircuit, shots=1000):
+def _prepared_state(qc: QuantumCircuit):
+    """
+    회로가 전체 큐비트에 대한 상태 준비(Initialize/StatePreparation) 하나뿐이면
+    목표 진폭 벡터를 반환, 아니면 None (내부 함수)
+    """
+    instructions = [instruction for instruction in qc.data
+                    if instruction.operation.name != 'barrier']
+    if len(instructions) != 1:
+        return None
+    
+    instruction = instructions[0]
+    if instruction.operation.name not in ('initialize', 'state_preparation'):
+        return None
+    if [qc.find_bit(q).index for q in instruction.qubits] != list(range(qc.num_qubits)):
+        return None
+    
+    # 비트열/정수 형태가 아닌 진폭 벡터로 지정된 경우만 사용
+    params = instruction.operation.params
+    if len(params) != 2 ** qc.num_qubits or isinstance(params[0], str):
+        return None
+    return np.asarray(params, dtype=complex)
+
+
+def _plot_counts(ax, states, values, shots: int, color, title=None):
+    """상태별 counts를 막대로 그리고 비율 라벨을 한 번에 표시 (내부 함수)"""
+    values = np.asarray(values, dtype=np.int64)
+    positions = np.arange(len(states))
+    
+    bars = ax.bar(positions, values, color=color)
+    ax.set_xticks(positions, states)
+    _style_axes(ax, shots, title)
+    
+    # 막대 위에 비율 표시 (라벨 문자열도 NumPy로 한 번에 생성, 0인 막대는 생략)
+    percentages = np.char.add(np.char.mod('%.1f', _percentages(values, shots)), '%')
+    bar_labels = np.where(values > 0, percentages, '')
+    ax.bar_label(bars, labels=bar_labels, fontsize=9)
+
+
+def _style_axes(ax, shots: int, title=None):
+    """히스토그램 축의 라벨/범위/눈금 스타일 적용 (내부 함수)"""
+    ax.set_xlabel('State', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    if title:
+        ax.set_title(title)
+    ax.set_ylim(0, shots * 1.2)
+    ax.tick_params(axis='both', labelsize=11)
+
+
+def _get_ideal_counts(circuit: QuantumCircuit, shots=1000, circuit_key=None):
+    """이론적 counts를 캐시에서 가져오거나 새로 계산 (circuit_key: 미리 계산한 회로 지문) (내부 함수)"""
+    if circuit_key is None:
+        circuit_key = _circuit_key(circuit)
+    key = (circuit_key, shots)
+    ideal_counts = _cache_get(_IDEAL_COUNTS_CACHE, key)
+    if ideal_counts is None:
+        ideal_counts = _compute_ideal_counts(circuit, shots)
+        _cache_put(_IDEAL_COUNTS_CACHE, key, ideal_counts, _IDEAL_COUNTS_CACHE_SIZE)
+    # 캐시된 dict가 호출자에 의해 수정되지 않도록 복사본 반환
+    return dict(ideal_counts)
+
+
+def _compute_ideal_counts(circuit: QuantumCircuit, shots=1000):
     """
     이론적 확률을 계산하여 샷 수에 맞게 counts 반환 (통계적 요동 없음)
     
     Statevector를 사용하여 정확한 이론적 확률을 계산한 후,
     샷 수에 비례하여 counts를 생성
     """
-    # 측정이 없는 회로 복사
-    qc_no_measure = circuit.copy()
-    if qc_no_measure.cregs:
-        # 측정 제거
-        qc_no_measure = QuantumCircuit(circuit.num_qubits)
+    qc_no_measure = _strip_measurements(circuit)
+    
+    # Statevector로 이론적 확률 계산 (2^n 크기의 dict 대신 NumPy 배열 사용)
+    # 상태 준비만 하는 회로는 게이트 분해/시뮬레이션 없이 목표 벡터를 그대로 사용
+    amplitudes = _prepared_state(qc_no_measure)
+    if amplitudes is not None:
+        probabilities = _probabilities(amplitudes)
+    elif qc_no_measure.num_qubits >= _GPU_MIN_QUBITS and _gpu_backend() is not None:
+        # 큰 회로는 CPU 메모리 대역폭이 병목이므로 GPU가 있으면 Aer GPU로 계산
+        probabilities = _aer_probabilities([circuit])[0]
+    else:
+        probabilities = _probabilities(Statevector(qc_no_measure).data)
+    
+    return _counts_from_probabilities(probabilities, qc_no_measure.num_qubits, shots)
+
+
+def _strip_measurements(circuit: QuantumCircuit):
+    """측정을 제외한 회로 반환 (내부 함수)"""
+    # 고전 레지스터가 없으면 측정도 없으므로 원본 그대로 (Statevector는 회로를 수정하지 않으므로 복사 불필요)
+    if not circuit.cregs:
+        return circuit
+    
+    # 마지막 측정 제거는 Qiskit 내장 메서드로 한 번에 처리
+    qc_no_measure = circuit.remove_final_measurements(inplace=False)
+    if 'measure' in qc_no_measure.count_ops():
+        # 중간 측정이 남아 있으면 원본 레지스터 구성을 유지한 채 측정만 제외
+        qc_no_measure = circuit.copy_empty_like()
         for instruction in circuit.data:
             if instruction.operation.name != 'measure':
                 qc_no_measure.append(instruction)
+    return qc_no_measure
+
+
+def _probabilities(amplitudes):
+    """진폭 배열을 상태별 확률 배열로 변환 (내부 함수)"""
+    # |a|^2를 제곱 결과용 2^n 배열을 새로 만들지 않고 제자리에서 계산
+    probabilities = np.abs(amplitudes)
+    np.square(probabilities, out=probabilities)
+    return probabilities
+
+
+def _counts_from_probabilities(probabilities, num_qubits: int, shots=1000):
+    """상태별 확률 배열을 샷 수에 맞는 counts로 변환 (내부 함수)"""
+    # 시뮬레이터마다 다른 부동소수점 오차가 정렬/반올림 결과를 바꾸지 않도록 먼저 정리
+    # (호출부마다 새로 만든 배열을 넘기므로 제자리에서 반올림)
+    probabilities = np.round(probabilities, 12, out=probabilities)
+    
+    # 확률이 높은 상위 k개만 후보로 선택 (샷 수보다 많은 상태가 나올 수는 없음)
+    k = min(shots, probabilities.size)
+    if k < probabilities.size:
+        # k번째로 큰 확률(경계값)만 부분 정렬로 구하고, 경계값보다 큰 상태는 모두 선택
+        cutoff = -np.partition(-probabilities, k - 1)[k - 1]
+        above = np.flatnonzero(probabilities > cutoff)
+        # 경계값과 같은 상태는 상태 순서대로 남은 개수만큼 선택 (항상 같은 결과)
+        ties = np.flatnonzero(probabilities == cutoff)[:k - above.size]
+        candidates = np.concatenate((above, ties))
+    else:
+        candidates = np.arange(probabilities.size)
     
-    # Statevector로 이론적 확률 계산
-    statevector = Statevector(qc_no_measure)
-    probabilities = statevector.probabilities_dict()
+    # 확률이 높은 순서대로 정렬 (동률이면 상태 순서 유지)
+    candidates = np.sort(candidates)
+    candidates = candidates[np.argsort(-probabilities[candidates], kind='stable')]
+    
+    # 반 샷 미만의 상태는 어차피 0으로 반올림되므로 제외 (최소 1개는 유지)
+    n_keep = max(1, np.count_nonzero(probabilities[candidates] > 0.5 / shots))
+    candidates = candidates[:n_keep]
     
     # 확률을 counts로 변환 (반올림하여 정수로)
-    ideal_counts = {}
-    remaining_shots = shots
+    counts = np.rint(np.round(probabilities[candidates] * shots, 9)).astype(np.int64)
+    # 마지막 상태는 남은 샷 모두 할당 (반올림 오차 보정)
+    counts[-1] = shots - counts[:-1].sum()
+    
+    # 살아남은 상태만 비트열로 변환하고, 0이 아닌 counts만 반환
+    return {np.binary_repr(index, width=num_qubits): int(count)
+            for index, count in zip(candidates, counts) if count > 0}
+
+
+def _aer_probabilities(circuits: list[QuantumCircuit]):
+    """여러 회로의 상태별 확률을 Aer statevector 시뮬레이터 한 작업으로 계산 (내부 함수)"""
+    # Aer를 먼저 로드해야 QuantumCircuit.save_statevector를 사용할 수 있음
+    simulator = _default_backend()
     
-    # 확률이 높은 순서대로 정렬
-    sorted_probs = sorted(probabilities.items(), key=lambda x: x[1], reverse=True)
+    probabilities_list = [None] * len(circuits)
+    sim_circuits = []
+    sim_indices = []
     
-    for i, (state, prob) in enumerate(sorted_probs):
-        if i == len(sorted_probs) - 1:
-            # 마지막 상태는 남은 샷 모두 할당 (반올림 오차 보정)
-            ideal_counts[state] = remaining_shots
-        else:
-            count = round(prob * shots)
-            ideal_counts[state] = count
-            remaining_shots -= count
+    for i, circuit in enumerate(circuits):
+        qc_no_measure = _strip_measurements(circuit)
+        amplitudes = _prepared_state(qc_no_measure)
+        if amplitudes is not None:
+            probabilities_list[i] = _probabilities(amplitudes)
+            continue
+        
+        # save_statevector는 회로를 수정하므로 원본이면 복사
+        if qc_no_measure is circuit:
+            qc_no_measure = circuit.copy()
+        qc_no_measure.save_statevector()
+        sim_circuits.append(qc_no_measure)
+        sim_indices.append(i)
     
-    # 0이 아닌 counts만 반환
-    return {state: count for state, count in ideal_counts.items() if count > 0}
+    if sim_circuits:
+        # 큰 회로가 섞여 있고 GPU를 사용할 수 있으면 작업 전체를 GPU에서 실행
+        if max(qc.num_qubits for qc in sim_circuits) >= _GPU_MIN_QUBITS:
+            simulator = _gpu_backend() or simulator
+        sim_circuits = transpile(sim_circuits, backend=simulator, optimization_level=0)
+        result = simulator.run(sim_circuits, method='statevector').result()
+        for j, i in enumerate(sim_indices):
+            probabilities_list[i] = _probabilities(np.asarray(result.get_statevector(j)))
+    
+    return probabilities_list
 
 
-def _get_ideal_counts_batch(circuits: list[QuantumCircuit], shots=1000):
-    """여러 회로의 이론적 counts를 계산 (내부 함수)"""
-    return [_get_ideal_counts(circuit, shots) for circuit in circuits]
+def _get_ideal_counts_batch(circuits: list[QuantumCircuit], shots=1000, circuit_keys=None):
+    """
+    여러 회로의 이론적 counts를 계산 (내부 함수)
+    
+    캐시에 없는 회로들은 Python 루프 대신 Aer statevector 작업 하나로 모아 계산한다.
+    circuit_keys가 주어지면 회로 지문을 다시 계산하지 않는다.
+    """
+    if circuit_keys is None:
+        circuit_keys = [_circuit_key(circuit) for circuit in circuits]
+    keys = [(circuit_key, shots) for circuit_key in circuit_keys]
+    ideal_counts_list = [_cache_get(_IDEAL_COUNTS_CACHE, key) for key in keys]
+    
+    # 캐시에 없는 회로를 지문별로 묶어 같은 회로는 한 번만 시뮬레이션
+    missing = {}
+    for i, ideal_counts in enumerate(ideal_counts_list):
+        if ideal_counts is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        groups = list(missing.values())
+        probabilities_list = _aer_probabilities([circuits[indices[0]] for indices in groups])
+        for indices, probabilities in zip(groups, probabilities_list):
+            first = indices[0]
+            ideal_counts = _counts_from_probabilities(probabilities, circuits[first].num_qubits, shots)
+            _cache_put(_IDEAL_COUNTS_CACHE, keys[first], ideal_counts, _IDEAL_COUNTS_CACHE_SIZE)
+            for i in indices:
+                ideal_counts_list[i] = ideal_counts
+    
+    # 캐시된 dict가 호출자에 의해 수정되지 않도록 복사본 반환
+    return [dict(ideal_counts) for ideal_counts in ideal_counts_list]
 
 
 # ==================== 메인 함수 ====================
@@ -138,7 +755,8 @@ def run_and_visualize(qc: QuantumCircuit,
                       show_results: bool = True,
                       circuit_style: str = 'mpl',
                       compare_with_ideal: bool = True,
-                      optimize_circuit: bool = True):
+                      optimize_circuit: bool = True,
+                      optimization_level: int = 1):
     """
     양자 회로를 실행하고 결과를 시각화한다.
 
@@ -152,6 +770,8 @@ def run_and_visualize(qc: QuantumCircuit,
         circuit_style (str): 회로도 스타일 ('mpl', 'text', 'latex'). 기본값은 'mpl'.
         compare_with_ideal (bool): 하드웨어 실행 시 시뮬레이터 결과도 함께 표시할지 여부. 기본값은 True.
         optimize_circuit (bool): 하드웨어 실행 시 회로 최적화(transpile) 여부. 기본값은 True.
+        optimization_level (int): 하드웨어 transpile 최적화 레벨 (0~3). 기본값은 1.
+            반복 실행 속도보다 충실도가 중요하면 3을 사용한다.
 
     Returns:
         dict or tuple: 측정 결과 counts.
@@ -164,131 +784,86 @@ def run_and_visualize(qc: QuantumCircuit,
         >>> counts = run_and_visualize(qc)
     """
     
-    # 회로 복사 (원본 수정 방지)
-    circuit = qc.copy()
-    
-    # 측정이 없으면 자동 추가
-    if not circuit.cregs:
-        circuit.measure_all()
+    # 측정 추가 (원본 수정 방지)
+    circuit = _with_measurements(qc)
     
     # 백엔드 설정
     if backend is None:
-        backend = AerSimulator()
+        backend = _default_backend()
     
     # 하드웨어 여부 체크
-    from qiskit import transpile
-    # AerSimulator는 시뮬레이터, 실제 하드웨어는 IBMBackend 타입
-    is_hardware = not isinstance(backend, AerSimulator)
+    is_hardware, backend_name = _backend_info(backend)
     
-    # 회로도 표시 (원본)
-    if show_circuit:
-        print("\n[ Quantum Circuit ]")
-        _display_circuit(circuit, style=circuit_style)
+    # 회로 지문은 transpile/이론값/회로도 캐시가 함께 쓰도록 한 번만 계산
+    # (시뮬레이터에서는 회로도에만 필요하므로 그릴 때 계산)
+    circuit_key = _circuit_key(circuit) if is_hardware else None
     
     # 하드웨어인 경우 transpile
     hw_circuit = circuit
     if is_hardware and optimize_circuit:
-        hw_circuit = transpile(circuit, backend=backend, optimization_level=3)
+        hw_circuit = _transpile_cached([circuit], backend, optimization_level, [circuit_key])[0]
+    
+    # 작업을 먼저 제출하고, 대기열에서 기다리는 동안 회로도 표시/이론값 계산
+    job = _submit_circuits([hw_circuit], backend, shots)
+    
+    # 회로도 표시 (원본)
+    if show_circuit:
+        print("\n[ Quantum Circuit ]")
+        _display_circuit(circuit, style=circuit_style, circuit_key=circuit_key)
         
         # Transpile된 회로 표시
-        if show_circuit and circuit_style == 'mpl':
+        if is_hardware and optimize_circuit and circuit_style == 'mpl':
             print("\n[ Transpiled Circuit (Basis Gates) ]")
             _display_circuit(hw_circuit, style=circuit_style)
     
     # 실행 및 결과
     if is_hardware and compare_with_ideal:
         # 이론적 확률과 하드웨어 결과 비교
-        ideal_counts = _get_ideal_counts(circuit, shots)
-        hw_counts = _run_circuit(hw_circuit, backend, shots)
+        ideal_counts = _get_ideal_counts(circuit, shots, circuit_key)
+        hw_counts = _collect_counts(job)[0]
         
         # 결과 출력 (비교)
         if show_results:
             print(f"\n[ Results Comparison ] shots={shots}")
             print("\n<Ideal (Simulator)>")
-            for state, count in sorted(ideal_counts.items(), key=lambda x: x[1], reverse=True):
-                probability = count / shots * 100
-                print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+            _print_counts(ideal_counts, shots)
             
-            print(f"\n<Hardware ({backend.name})>")
-            for state, count in sorted(hw_counts.items(), key=lambda x: x[1], reverse=True):
-                probability = count / shots * 100
-                print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+            print(f"\n<Hardware ({backend_name})>")
+            _print_counts(hw_counts, shots)
         
         # 히스토그램 표시 (비교)
         if show_histogram:
             print("\n[ Histogram Comparison ]")
-            fig, axes = plt.subplots(1, 2, figsize=(8, 3))
+            fig, axes = _get_figure(1, 2, (8, 3))
             
-            # Ideal - x축 정렬
-            sorted_ideal = dict(sorted(ideal_counts.items()))
-            bars_ideal = axes[0].bar(sorted_ideal.keys(), sorted_ideal.values(), color='C0')
-            axes[0].set_xlabel('State', fontsize=12)
-            axes[0].set_ylabel('Count', fontsize=12)
-            axes[0].set_title('Ideal (Simulator)')
-            axes[0].set_ylim(0, shots * 1.2)
-            axes[0].tick_params(axis='both', labelsize=11)
-            # 막대 위에 비율 표시
-            for bar in bars_ideal:
-                height = bar.get_height()
-                axes[0].text(bar.get_x() + bar.get_width()/2., height,
-                           f'{height/shots*100:.1f}%',
-                           ha='center', va='bottom', fontsize=9)
+            # 두 결과를 같은 x축(상태 합집합)에 정렬
+            states, (ideal_values, hw_values) = _align_counts(ideal_counts, hw_counts)
+            _plot_counts(axes[0, 0], states, ideal_values, shots, 'C0', 'Ideal (Simulator)')
+            _plot_counts(axes[0, 1], states, hw_values, shots, 'C1', f'Hardware ({backend_name})')
             
-            # Hardware - x축 정렬
-            sorted_hw = dict(sorted(hw_counts.items()))
-            bars_hw = axes[1].bar(sorted_hw.keys(), sorted_hw.values(), color='C1')
-            axes[1].set_xlabel('State', fontsize=12)
-            axes[1].set_ylabel('Count', fontsize=12)
-            axes[1].set_title(f'Hardware ({backend.name})')
-            axes[1].set_ylim(0, shots * 1.2)
-            axes[1].tick_params(axis='both', labelsize=11)
-            # 막대 위에 비율 표시
-            for bar in bars_hw:
-                height = bar.get_height()
-                axes[1].text(bar.get_x() + bar.get_width()/2., height,
-                           f'{height/shots*100:.1f}%',
-                           ha='center', va='bottom', fontsize=9)
-            
-            fig.tight_layout()
-            display(fig)
-            plt.close()
+            _show_figure(fig)
         
         return ideal_counts, hw_counts
     
     else:
         # 일반 실행 (시뮬레이터 또는 비교 안 함)
-        counts = _run_circuit(hw_circuit, backend, shots)
+        counts = _collect_counts(job)[0]
         
         if show_results:
-            backend_name = getattr(backend, 'name', 'Simulator')
             print(f"\n[ Results ] shots={shots}, states={len(counts)} ({backend_name})")
-            for state, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
-                probability = count / shots * 100
-                print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+            _print_counts(counts, shots)
         
         # 히스토그램 표시
         if show_histogram:
             print("\n[ Histogram ]")
-            fig, ax = plt.subplots(figsize=(5, 3))
+            fig, axes = _get_figure(1, 1, (5, 3))
+            ax = axes[0, 0]
             
             # x축 정렬
-            sorted_counts = dict(sorted(counts.items()))
-            bars = ax.bar(sorted_counts.keys(), sorted_counts.values(), color='C0')
-            ax.set_xlabel('State', fontsize=12)
-            ax.set_ylabel('Count', fontsize=12)
-            ax.set_ylim(0, shots * 1.2)
-            ax.tick_params(axis='both', labelsize=11)
-            
-            # 막대 위에 비율 표시
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height/shots*100:.1f}%',
-                       ha='center', va='bottom', fontsize=9)
+            states, values = _sorted_counts(counts)
+            _plot_counts(ax, states, values, shots, 'C0')
             
-            fig.tight_layout()
-            display(fig)
-            plt.close()
+            _show_figure(fig)
         
         return counts
 
@@ -301,7 +876,8 @@ def compare_circuits(circuits: list[QuantumCircuit],
                      show_histogram=True, 
                      show_results=True,
                      circuit_style='mpl', 
-                     compare_with_ideal=True):
+                     compare_with_ideal=True,
+                     optimization_level=1):
     """
     여러 양자 회로의 결과를 비교합니다.
     
@@ -325,6 +901,8 @@ def compare_circuits(circuits: list[QuantumCircuit],
         회로도 스타일 ('mpl', 'text', 'latex')
     compare_with_ideal : bool, default=True
         하드웨어 실행 시 시뮬레이터 결과도 함께 표시
+    optimization_level : int, default=1
+        하드웨어 transpile 최적화 레벨 (0~3). 충실도가 중요하면 3 사용
     
     Returns
     -------
@@ -341,153 +919,104 @@ def compare_circuits(circuits: list[QuantumCircuit],
     """
     
     if backend is None:
-        backend = AerSimulator()
+        backend = _default_backend()
     
     if labels is None:
         labels = [f"Circuit {i+1}" for i in range(len(circuits))]
     
-    # 측정 추가
-    from qiskit import transpile
-    # AerSimulator는 시뮬레이터, 실제 하드웨어는 IBMBackend 타입
-    is_hardware = not isinstance(backend, AerSimulator)
+    is_hardware, backend_name = _backend_info(backend)
     
-    circuits_with_measurement = []
-    for circuit in circuits:
-        qc = circuit.copy()
-        if not qc.cregs:
-            qc.measure_all()
-        circuits_with_measurement.append(qc)
+    # 측정 추가 (측정이 이미 있는 회로는 복사하지 않고 그대로 사용)
+    circuits_with_measurement = [_with_measurements(circuit) for circuit in circuits]
     
-    # 회로도 표시 (원본)
-    if show_circuit:
-        print("\n[ Quantum Circuits ]")
-        _display_circuits_grid(circuits_with_measurement, labels, style=circuit_style)
+    # 동일한 회로는 한 번만 transpile/실행하고 결과를 원래 위치로 되돌림
+    # (회로 지문은 중복 제거/transpile/이론값/회로도 캐시가 함께 쓰도록 한 번만 계산)
+    circuit_keys = _circuit_keys(circuits_with_measurement)
+    unique_circuits, unique_keys, positions = _unique_circuits(circuits_with_measurement, circuit_keys)
     
     # 하드웨어인 경우 transpile
-    hw_circuits = circuits_with_measurement
+    hw_unique = unique_circuits
     if is_hardware:
-        hw_circuits = [transpile(qc, backend=backend, optimization_level=3) 
-                      for qc in circuits_with_measurement]
+        # 캐시에 없는 회로는 한 번에 transpile (PassManager 내부에서 병렬 처리됨)
+        hw_unique = _transpile_cached(unique_circuits, backend, optimization_level, unique_keys)
+    
+    # 작업을 먼저 제출하고, 대기열에서 기다리는 동안 회로도 표시/이론값 계산
+    job = _submit_circuits(hw_unique, backend, shots)
+    
+    # 회로도 표시 (원본)
+    if show_circuit:
+        print("\n[ Quantum Circuits ]")
+        _display_circuits_grid(circuits_with_measurement, labels, style=circuit_style,
+                               circuit_keys=circuit_keys)
         
         # Transpile된 회로 표시
-        if show_circuit and circuit_style == 'mpl':
+        if is_hardware and circuit_style == 'mpl':
             print("\n[ Transpiled Circuits (Basis Gates) ]")
             transpile_labels = [f"{label} (transpiled)" for label in labels]
+            hw_circuits = [hw_unique[j] for j in positions]
             _display_circuits_grid(hw_circuits, transpile_labels, style=circuit_style)
     
     # 실행 및 결과
     if is_hardware and compare_with_ideal:
         # 이론적 확률과 하드웨어 결과 비교
-        ideal_counts_list = _get_ideal_counts_batch(circuits_with_measurement, shots)
-        hw_counts_list = _run_circuits_batch(hw_circuits, backend, shots)
+        ideal_unique = _get_ideal_counts_batch(unique_circuits, shots, unique_keys)
+        hw_unique_counts = _collect_counts(job)
+        ideal_counts_list = [dict(ideal_unique[j]) for j in positions]
+        hw_counts_list = [dict(hw_unique_counts[j]) for j in positions]
         
         # 결과 출력 (비교)
         if show_results:
-            print(f"\n[ Results Comparison ] shots={shots}")
-            
+            # 모든 줄을 모아 한 번에 출력
+            lines = [f"\n[ Results Comparison ] shots={shots}"]
             for i, label in enumerate(labels):
-                print(f"\n{label}:")
-                print("  <Ideal>", end="")
-                for state, count in sorted(ideal_counts_list[i].items(), key=lambda x: x[1], reverse=True)[:3]:
-                    probability = count / shots * 100
-                    print(f"  |{state}⟩: {probability:5.1f}%", end="")
-                
-                print(f"\n  <HW>   ", end="")
-                for state, count in sorted(hw_counts_list[i].items(), key=lambda x: x[1], reverse=True)[:3]:
-                    probability = count / shots * 100
-                    print(f"  |{state}⟩: {probability:5.1f}%", end="")
-                print()
+                lines.append(f"\n{label}:")
+                lines.append(f"  <Ideal>{_format_top(ideal_counts_list[i], shots)}")
+                lines.append(f"  <HW>   {_format_top(hw_counts_list[i], shots)}")
+            print("\n".join(lines))
         
         # 히스토그램 표시 (비교)
         if show_histogram:
             print("\n[ Comparison Histogram ]")
             
             n_circuits = len(circuits)
-            fig, axes = plt.subplots(2, n_circuits, figsize=(4 * n_circuits, 6))
-            
-            if n_circuits == 1:
-                axes = axes.reshape(2, 1)
+            fig, axes = _get_figure(2, n_circuits, (4 * n_circuits, 6))
             
             for idx, label in enumerate(labels):
-                # Ideal - x축 정렬
-                sorted_ideal = dict(sorted(ideal_counts_list[idx].items()))
-                bars_ideal = axes[0, idx].bar(sorted_ideal.keys(), sorted_ideal.values(), color='C0')
-                axes[0, idx].set_xlabel('State', fontsize=12)
-                axes[0, idx].set_ylabel('Count', fontsize=12)
-                axes[0, idx].set_title(f'{label} (Ideal)')
-                axes[0, idx].set_ylim(0, shots * 1.2)
-                axes[0, idx].tick_params(axis='both', labelsize=11)
-                # 막대 위에 비율 표시
-                for bar in bars_ideal:
-                    height = bar.get_height()
-                    axes[0, idx].text(bar.get_x() + bar.get_width()/2., height,
-                                    f'{height/shots*100:.1f}%',
-                                    ha='center', va='bottom', fontsize=9)
-                
-                # Hardware - x축 정렬
-                sorted_hw = dict(sorted(hw_counts_list[idx].items()))
-                bars_hw = axes[1, idx].bar(sorted_hw.keys(), sorted_hw.values(), color='C1')
-                axes[1, idx].set_xlabel('State', fontsize=12)
-                axes[1, idx].set_ylabel('Count', fontsize=12)
-                axes[1, idx].set_title(f'{label} (HW)')
-                axes[1, idx].set_ylim(0, shots * 1.2)
-                axes[1, idx].tick_params(axis='both', labelsize=11)
-                # 막대 위에 비율 표시
-                for bar in bars_hw:
-                    height = bar.get_height()
-                    axes[1, idx].text(bar.get_x() + bar.get_width()/2., height,
-                                    f'{height/shots*100:.1f}%',
-                                    ha='center', va='bottom', fontsize=9)
+                # 두 결과를 같은 x축(상태 합집합)에 정렬
+                states, (ideal_values, hw_values) = _align_counts(ideal_counts_list[idx],
+                                                                  hw_counts_list[idx])
+                _plot_counts(axes[0, idx], states, ideal_values, shots, 'C0', f'{label} (Ideal)')
+                _plot_counts(axes[1, idx], states, hw_values, shots, 'C1', f'{label} (HW)')
             
-            fig.tight_layout()
-            display(fig)
-            plt.close()
+            _show_figure(fig)
         
         return ideal_counts_list, hw_counts_list
     
     else:
         # 일반 실행 (시뮬레이터 또는 비교 안 함)
-        all_counts = _run_circuits_batch(hw_circuits, backend, shots)
+        unique_counts = _collect_counts(job)
+        all_counts = [dict(unique_counts[j]) for j in positions]
         
         if show_results:
-            backend_name = getattr(backend, 'name', 'Simulator')
             print(f"\n[ Results ] shots={shots} ({backend_name})")
             for i, (label, counts) in enumerate(zip(labels, all_counts)):
                 print(f"\n{label}:")
-                for state, count in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:5]:
-                    probability = count / shots * 100
-                    print(f"  |{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+                _print_counts(counts, shots, top=5, indent='  ')
         
         # 히스토그램
         if show_histogram:
             print("\n[ Comparison Histogram ]")
             
             n_circuits = len(all_counts)
-            fig, axes = plt.subplots(1, n_circuits, figsize=(4 * n_circuits, 3))
-            
-            if n_circuits == 1:
-                axes = [axes]
+            fig, axes = _get_figure(1, n_circuits, (4 * n_circuits, 3))
+            axes = axes[0]
             
             for idx, (counts, label) in enumerate(zip(all_counts, labels)):
                 # x축 정렬
-                sorted_counts = dict(sorted(counts.items()))
-                bars = axes[idx].bar(sorted_counts.keys(), sorted_counts.values(), color=f'C{idx}')
-                axes[idx].set_xlabel('State', fontsize=12)
-                axes[idx].set_ylabel('Count', fontsize=12)
-                axes[idx].set_title(label)
-                axes[idx].set_ylim(0, shots * 1.2)
-                axes[idx].tick_params(axis='both', labelsize=11)
-                
-                # 막대 위에 비율 표시
-                for bar in bars:
-                    height = bar.get_height()
-                    axes[idx].text(bar.get_x() + bar.get_width()/2., height,
-                                 f'{height/shots*100:.1f}%',
-                                 ha='center', va='bottom', fontsize=9)
+                states, values = _sorted_counts(counts)
+                _plot_counts(axes[idx], states, values, shots, f'C{idx}', label)
             
-            fig.tight_layout()
-            display(fig)
-            plt.close()
+            _show_figure(fig)
         
         return all_counts
 
@@ -496,7 +1025,8 @@ def quick_run(qc: QuantumCircuit,
               shots=1000, 
               backend=None, 
               show_results=False,
-              compare_with_ideal=False):
+              compare_with_ideal=False,
+              optimization_level=1):
     """
     양자 회로를 빠르게 실행하고 결과만 반환합니다 (시각화 없음).
     
@@ -512,56 +1042,50 @@ def quick_run(qc: QuantumCircuit,
         측정 결과를 텍스트로 출력할지 여부
     compare_with_ideal : bool, default=False
         하드웨어 실행 시 시뮬레이터 결과도 함께 반환
+    optimization_level : int, default=1
+        하드웨어 transpile 최적화 레벨 (0~3). 충실도가 중요하면 3 사용
     
     Returns
     -------
     dict or tuple of dict
         측정 결과 counts (compare_with_ideal=True이고 하드웨어면 (ideal_counts, hw_counts))
     """
-    circuit = qc.copy()
-    if not circuit.cregs:
-        circuit.measure_all()
+    circuit = _with_measurements(qc)
     
     if backend is None:
-        backend = AerSimulator()
+        backend = _default_backend()
     
-    from qiskit import transpile
-    # AerSimulator는 시뮬레이터, 실제 하드웨어는 IBMBackend 타입
-    is_hardware = not isinstance(backend, AerSimulator)
+    is_hardware, backend_name = _backend_info(backend)
     
     if is_hardware:
-        circuit = transpile(circuit, backend=backend, optimization_level=3)
+        # 회로 지문은 transpile/이론값 캐시가 함께 쓰도록 한 번만 계산
+        circuit_key = _circuit_key(circuit)
+        hw_circuit = _transpile_cached([circuit], backend, optimization_level, [circuit_key])[0]
         
         if compare_with_ideal:
-            # 원본 회로에서 이론적 확률 계산
-            original_circuit = qc.copy()
-            if not original_circuit.cregs:
-                original_circuit.measure_all()
-            ideal_counts = _get_ideal_counts(original_circuit, shots)
-            hw_counts = _run_circuit(circuit, backend, shots)
+            # 하드웨어 작업을 먼저 제출하고, 대기열에서 기다리는 동안
+            # 원본 회로에서 이론적 확률 계산 (측정을 추가한 회로를 다시 복사하지 않고 재사용)
+            hw_job = _submit_circuits([hw_circuit], backend, shots)
+            ideal_counts = _get_ideal_counts(circuit, shots, circuit_key)
+            hw_counts = _collect_counts(hw_job)[0]
             
             if show_results:
                 print(f"\n[ Quick Run Results ] shots={shots}")
                 print("\n<Ideal (Simulator)>")
-                for state, count in sorted(ideal_counts.items(), key=lambda x: x[1], reverse=True):
-                    probability = count / shots * 100
-                    print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+                _print_counts(ideal_counts, shots)
                 
-                print(f"\n<Hardware ({backend.name})>")
-                for state, count in sorted(hw_counts.items(), key=lambda x: x[1], reverse=True):
-                    probability = count / shots * 100
-                    print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+                print(f"\n<Hardware ({backend_name})>")
+                _print_counts(hw_counts, shots)
             
             return ideal_counts, hw_counts
+        
+        circuit = hw_circuit
     
     counts = _run_circuit(circuit, backend, shots)
     
     if show_results:
-        backend_name = getattr(backend, 'name', 'Simulator')
         print(f"\n[ Quick Run Results ] shots={shots} ({backend_name})")
-        for state, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
-            probability = count / shots * 100
-            print(f"|{state}⟩: {count:4d}회 ({probability:6.2f}%)")
+        _print_counts(counts, shots)
     
     return counts
 